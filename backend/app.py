@@ -1,29 +1,97 @@
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Response, request, jsonify, send_file
+from flask.json.provider import JSONProvider
+from flask_caching import Cache
 from flask_cors import CORS
+import orjson
+import hashlib
 import os
-import uuid
 import sys
+import uuid
+from collections import OrderedDict
 from werkzeug.utils import secure_filename
 
+try:
+    import blake3
+    def _content_digest(data: bytes) -> str:
+        return blake3.blake3(data).hexdigest()
+except ImportError:
+    # blake3 (SIMD-accelerated) is optional; blake2b is the stdlib fallback
+    def _content_digest(data: bytes) -> str:
+        return hashlib.blake2b(data, digest_size=16).hexdigest()
+
 # Add the app directory to Python path
 sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app'))
 
 try:
     from models.pose_analyzer import PoseAnalyzer
     from utils.file_utils import allowed_file, create_upload_folder
-    from models.ml.model_trainer import ModelTrainer
+    from models.ml.trainer_factory import get_trainer
     from models.ml.data_collector import DataCollector
 except ImportError as e:
     print(f"Import error: {e}")
     print("Make sure the __init__.py files are in the app, models, and utils directories")
     sys.exit(1)
 
-app = Flask(__name__)
+class ORJSONProvider(JSONProvider):
+    """JSON provider backed by orjson (C serializer with native NumPy support)"""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
+class ExerciseAnalyzerFlask(Flask):
+    json_provider_class = ORJSONProvider
+
+
+app = ExerciseAnalyzerFlask(__name__)
 CORS(app)
 
+# Response cache for read-heavy GET endpoints: Redis when configured
+# (shared across gunicorn workers), in-process SimpleCache otherwise
+_cache_redis_url = os.environ.get('CACHE_REDIS_URL')
+if _cache_redis_url:
+    cache = Cache(app, config={
+        'CACHE_TYPE': 'RedisCache',
+        'CACHE_REDIS_URL': _cache_redis_url
+    })
+else:
+    cache = Cache(app, config={'CACHE_TYPE': 'SimpleCache'})
+
+def _invalidate_view_cache(path: str) -> None:
+    """Drop the cached response for a path-keyed cached view"""
+    cache.delete(f'view/{path}')
+
+def _cacheable_response(rv) -> bool:
+    """Only cache successful view results, so a transient error is not
+    replayed for the whole TTL"""
+    if isinstance(rv, tuple) and len(rv) > 1:
+        status = rv[1]
+    else:
+        status = getattr(rv, 'status_code', 200)
+    return 200 <= status < 300
+
+def _pick_upload_folder():
+    """Keep transient uploads on tmpfs when available so the bytes stay in
+    RAM instead of being committed to disk before deletion.
+
+    Only if the tmpfs is big enough: every request thread can hold one
+    MAX_CONTENT_LENGTH upload at once, and a 64MB default /dev/shm would
+    ENOSPC under concurrent uploads. docker-compose sets shm_size
+    accordingly; anything smaller falls back to the uploads/ directory.
+    """
+    if os.path.isdir('/dev/shm') and os.access('/dev/shm', os.W_OK):
+        stat = os.statvfs('/dev/shm')
+        # 16 concurrent 16MB uploads (4 workers x 4 threads)
+        if stat.f_bavail * stat.f_frsize >= 16 * 16 * 1024 * 1024:
+            return '/dev/shm/rehab_uploads'
+    return 'uploads'
+
 # Configuration
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
-app.config['UPLOAD_FOLDER'] = 'uploads'
+app.config['UPLOAD_FOLDER'] = _pick_upload_folder()
 app.config['ALLOWED_EXTENSIONS'] = {'png', 'jpg', 'jpeg', 'gif', 'mp4', 'avi', 'mov'}
 
 # Create upload folder if it doesn't exist
@@ -32,10 +100,119 @@ create_upload_folder(app.config['UPLOAD_FOLDER'])
 # Initialize pose analyzer
 pose_analyzer = PoseAnalyzer()
 
-# Initialize ML components
-model_trainer = ModelTrainer()
+# Initialize ML components (the trainer is shared with the analyzers)
+model_trainer = get_trainer()
 data_collector = DataCollector()
 
+# Warm the model cache at import time. Under gunicorn --preload (see
+# wsgi.py, the entry point) this runs in the master, so the memory-mapped
+# forest arrays are inherited by every forked worker as shared read-only
+# pages - one copy of each model in RAM regardless of worker count. Only
+# these mmap-friendly pickles are preloaded; the MediaPipe graph is
+# built lazily per worker thread because native graph state does not
+# survive a fork.
+for _exercise_type in ('pull_up', 'push_up', 'squat'):
+    model_trainer.load_model(_exercise_type)
+
+# Static catalogue data: immutable, so serialize once at import time and
+# serve the precomputed bytes directly
+SUPPORTED_EXERCISES = [
+    {
+        'id': 'pull_up',
+        'name': 'Pull Up',
+        'description': 'Upper body strength exercise targeting back and biceps',
+        'difficulty': 'Intermediate'
+    },
+    {
+        'id': 'push_up',
+        'name': 'Push Up',
+        'description': 'Bodyweight exercise targeting chest, shoulders, and triceps',
+        'difficulty': 'Beginner'
+    },
+    {
+        'id': 'squat',
+        'name': 'Squat',
+        'description': 'Lower body exercise targeting quadriceps, hamstrings, and glutes',
+        'difficulty': 'Beginner'
+    },
+    {
+        'id': 'deadlift',
+        'name': 'Deadlift',
+        'description': 'Compound exercise targeting posterior chain',
+        'difficulty': 'Advanced'
+    },
+    {
+        'id': 'plank',
+        'name': 'Plank',
+        'description': 'Core stability exercise',
+        'difficulty': 'Beginner'
+    }
+]
+
+EXERCISE_TIPS = {
+    'pull_up': [
+        'Keep your core engaged throughout the movement',
+        'Pull your shoulder blades down and back',
+        'Avoid swinging or using momentum',
+        'Lower yourself with control'
+    ],
+    'push_up': [
+        'Maintain a straight line from head to heels',
+        'Keep your core tight',
+        'Lower your body as a single unit',
+        'Keep your elbows close to your body'
+    ],
+    'squat': [
+        'Keep your chest up and core engaged',
+        'Push your knees out in line with your toes',
+        'Keep your weight in your heels',
+        'Go as deep as you can while maintaining good form'
+    ],
+    'deadlift': [
+        'Keep your back straight and core engaged',
+        'Push through your heels',
+        'Keep the bar close to your body',
+        'Stand up straight at the top'
+    ],
+    'plank': [
+        'Keep your body in a straight line',
+        'Engage your core muscles',
+        'Don\'t let your hips sag',
+        'Breathe steadily'
+    ]
+}
+
+_EXERCISES_JSON = orjson.dumps(SUPPORTED_EXERCISES)
+_TIPS_JSON = {
+    exercise_id: orjson.dumps({'exercise_id': exercise_id, 'tips': tips})
+    for exercise_id, tips in EXERCISE_TIPS.items()
+}
+
+# LRU cache of analysis results keyed by (file content hash, exercise type)
+# so re-submitting the same video skips the full pose pipeline
+_ANALYSIS_CACHE_SIZE = 128
+_analysis_cache = OrderedDict()
+
+def _get_cached_analysis(cache_key):
+    """Return a cached analysis result, refreshing its LRU position"""
+    result = _analysis_cache.get(cache_key)
+    if result is not None:
+        _analysis_cache.move_to_end(cache_key)
+    return result
+
+def _store_cached_analysis(cache_key, result):
+    """Store an analysis result, evicting the least recently used entry"""
+    _analysis_cache[cache_key] = result
+    _analysis_cache.move_to_end(cache_key)
+    while len(_analysis_cache) > _ANALYSIS_CACHE_SIZE:
+        _analysis_cache.popitem(last=False)
+
+def _invalidate_analysis_cache(exercise_type):
+    """Drop cached analyses for an exercise type after its model retrains,
+    so resubmitted videos are scored by the new model"""
+    for key in [k for k in _analysis_cache if k[1] == exercise_type]:
+        del _analysis_cache[key]
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
@@ -62,17 +239,33 @@ def analyze_exercise():
         
         filename = secure_filename(file.filename)
         file_extension = filename.rsplit('.', 1)[1].lower()
-        unique_filename = f"{uuid.uuid4()}.{file_extension}"
-        file_path = os.path.join(app.config['UPLOAD_FOLDER'], unique_filename)
-        file.save(file_path)
-        
-        analysis_result = pose_analyzer.analyze_exercise(file_path, exercise_type)
-        
+
+        # Hash the upload (MAX_CONTENT_LENGTH bounds the buffer): the
+        # digest is the dedup cache key, so repeated submissions of the
+        # same file skip the disk write and analysis entirely
+        file_bytes = file.read()
+        digest = _content_digest(file_bytes)
+
+        cache_key = (digest, exercise_type)
+        analysis_result = _get_cached_analysis(cache_key)
+        if analysis_result is None:
+            # Per-request filename: concurrent uploads of the same bytes
+            # must not share a path, or one request's cleanup deletes the
+            # file another is still decoding
+            unique_filename = f"{digest}-{uuid.uuid4().hex}.{file_extension}"
+            file_path = os.path.join(app.config['UPLOAD_FOLDER'], unique_filename)
+            with open(file_path, 'wb') as f:
+                f.write(file_bytes)
+            try:
+                analysis_result = pose_analyzer.analyze_exercise(file_path, exercise_type)
+            finally:
+                os.remove(file_path)
+            if analysis_result.get('success'):
+                _store_cached_analysis(cache_key, analysis_result)
+
         # Include pose_data in response for potential feedback collection
         # (pose_data is stored internally and can be retrieved if needed)
-        
-        os.remove(file_path)
-        
+
         return jsonify(analysis_result)
         
     except Exception as e:
@@ -81,78 +274,18 @@ def analyze_exercise():
 @app.route('/api/exercises', methods=['GET'])
 def get_supported_exercises():
     """Get list of supported exercises"""
-    exercises = [
-        {
-            'id': 'pull_up',
-            'name': 'Pull Up',
-            'description': 'Upper body strength exercise targeting back and biceps',
-            'difficulty': 'Intermediate'
-        },
-        {
-            'id': 'push_up',
-            'name': 'Push Up',
-            'description': 'Bodyweight exercise targeting chest, shoulders, and triceps',
-            'difficulty': 'Beginner'
-        },
-        {
-            'id': 'squat',
-            'name': 'Squat',
-            'description': 'Lower body exercise targeting quadriceps, hamstrings, and glutes',
-            'difficulty': 'Beginner'
-        },
-        {
-            'id': 'deadlift',
-            'name': 'Deadlift',
-            'description': 'Compound exercise targeting posterior chain',
-            'difficulty': 'Advanced'
-        },
-        {
-            'id': 'plank',
-            'name': 'Plank',
-            'description': 'Core stability exercise',
-            'difficulty': 'Beginner'
-        }
-    ]
-    return jsonify(exercises)
+    return Response(_EXERCISES_JSON, mimetype='application/json')
 
 @app.route('/api/exercise/<exercise_id>/tips', methods=['GET'])
 def get_exercise_tips(exercise_id):
     """Get form tips for a specific exercise"""
-    tips = {
-        'pull_up': [
-            'Keep your core engaged throughout the movement',
-            'Pull your shoulder blades down and back',
-            'Avoid swinging or using momentum',
-            'Lower yourself with control'
-        ],
-        'push_up': [
-            'Maintain a straight line from head to heels',
-            'Keep your core tight',
-            'Lower your body as a single unit',
-            'Keep your elbows close to your body'
-        ],
-        'squat': [
-            'Keep your chest up and core engaged',
-            'Push your knees out in line with your toes',
-            'Keep your weight in your heels',
-            'Go as deep as you can while maintaining good form'
-        ],
-        'deadlift': [
-            'Keep your back straight and core engaged',
-            'Push through your heels',
-            'Keep the bar close to your body',
-            'Stand up straight at the top'
-        ],
-        'plank': [
-            'Keep your body in a straight line',
-            'Engage your core muscles',
-            'Don\'t let your hips sag',
-            'Breathe steadily'
-        ]
-    }
-    
-    exercise_tips = tips.get(exercise_id, ['No specific tips available for this exercise'])
-    return jsonify({'exercise_id': exercise_id, 'tips': exercise_tips})
+    cached = _TIPS_JSON.get(exercise_id)
+    if cached is not None:
+        return Response(cached, mimetype='application/json')
+    return jsonify({
+        'exercise_id': exercise_id,
+        'tips': ['No specific tips available for this exercise']
+    })
 
 @app.route('/api/train', methods=['POST'])
 def train_model():
@@ -186,7 +319,13 @@ def train_model():
             labels=labels,
             model_type=model_type
         )
-        
+
+        # New model on disk - drop cached model-status lookups, cached
+        # responses, and memoized analyses scored by the old model
+        pose_analyzer.invalidate_model_cache(exercise_type)
+        _invalidate_view_cache(f'/api/model-status/{exercise_type}')
+        _invalidate_analysis_cache(exercise_type)
+
         return jsonify(results)
         
     except Exception as e:
@@ -222,6 +361,9 @@ def submit_feedback():
             metadata=metadata
         )
         
+        # New training example - drop the cached statistics response
+        _invalidate_view_cache(f'/api/training-data/{exercise_type}')
+
         return jsonify({
             'success': True,
             'example_id': example_id,
@@ -232,6 +374,7 @@ def submit_feedback():
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/training-data/<exercise_type>', methods=['GET'])
+@cache.cached(timeout=30, response_filter=_cacheable_response)
 def get_training_data_stats(exercise_type):
     """Get statistics about collected training data for an exercise"""
     try:
@@ -244,6 +387,7 @@ def get_training_data_stats(exercise_type):
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/model-status/<exercise_type>', methods=['GET'])
+@cache.cached(timeout=30, response_filter=_cacheable_response)
 def get_model_status(exercise_type):
     """Check if a trained model exists for an exercise type"""
     try:
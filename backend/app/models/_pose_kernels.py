@@ -0,0 +1,50 @@
+"""
+Numeric kernels for per-frame pose processing.
+
+With numba installed the loop version is JIT-compiled to native code;
+otherwise the vectorized NumPy equivalent is used, so callers get the
+same results either way (mirrors ml/_fe_kernels.py).
+"""
+import math
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    njit = None
+
+
+def _joint_angles_loop(landmarks, idx):
+    """
+    Joint angles in degrees for a (landmarks, 3) coordinate array and a
+    (joints, 3) index array of (a, b, c) triplets - the angle at b
+    between segments b->a and b->c.
+    """
+    out = np.empty(idx.shape[0], dtype=np.float32)
+    for k in range(idx.shape[0]):
+        a = landmarks[idx[k, 0]]
+        b = landmarks[idx[k, 1]]
+        c = landmarks[idx[k, 2]]
+        radians = (math.atan2(c[1] - b[1], c[0] - b[0])
+                   - math.atan2(a[1] - b[1], a[0] - b[0]))
+        angle = abs(radians) * (180.0 / math.pi)
+        out[k] = 360.0 - angle if angle > 180.0 else angle
+    return out
+
+
+def _joint_angles_numpy(landmarks, idx):
+    a = landmarks[idx[:, 0], :2]
+    b = landmarks[idx[:, 1], :2]
+    c = landmarks[idx[:, 2], :2]
+    radians = (np.arctan2(c[:, 1] - b[:, 1], c[:, 0] - b[:, 0])
+               - np.arctan2(a[:, 1] - b[:, 1], a[:, 0] - b[:, 0]))
+    degrees = np.abs(radians) * (180.0 / np.pi)
+    return np.where(degrees > 180.0, 360.0 - degrees, degrees).astype(np.float32)
+
+
+if NUMBA_AVAILABLE:
+    joint_angles = njit(cache=True, fastmath=True)(_joint_angles_loop)
+else:
+    joint_angles = _joint_angles_numpy
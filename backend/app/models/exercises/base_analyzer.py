@@ -2,19 +2,101 @@
 Base analyzer class that provides ML model integration.
 All exercise analyzers should inherit from this.
 """
+import logging
+import time
+import numpy as np
+from dataclasses import dataclass
 from typing import List, Dict, Optional
-from ..ml.model_trainer import ModelTrainer
+from ..ml.model_trainer import ModelTrainer, ModelNotFoundError
+from ..ml.trainer_factory import get_trainer
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PoseBatch:
+    """
+    Structure-of-arrays view of a pose_data sequence.
+
+    Converts the per-frame list-of-dicts layout into contiguous NumPy
+    arrays once so rule checks are plain column slices instead of
+    per-frame dict lookups. Arrays are float32: normalized coordinates
+    and degree angles fit comfortably, and half the bytes means half the
+    memory bandwidth through the rule checks.
+    """
+    landmarks: np.ndarray          # (frames, landmarks, 3) float32
+    angles: Dict[str, np.ndarray]  # angle name -> (frames,) float32
+    landmark_map: Dict[str, int]
+    frames: Optional[List[Dict]] = None  # source frames, kept for ML paths
+
+    _DEFAULT_ANGLE = 180.0
+
+    @classmethod
+    def from_pose_data(cls, pose_data: List[Dict]) -> 'PoseBatch':
+        """Build a batch from the raw per-frame dictionaries"""
+        landmarks = np.asarray([frame['landmarks'] for frame in pose_data], dtype=np.float32)
+
+        angle_names = set()
+        for frame in pose_data:
+            angle_names.update(frame.get('angles', {}))
+        angles = {
+            name: np.array([frame.get('angles', {}).get(name, cls._DEFAULT_ANGLE)
+                            for frame in pose_data], dtype=np.float32)
+            for name in angle_names
+        }
+
+        return cls(
+            landmarks=landmarks,
+            angles=angles,
+            landmark_map=pose_data[0].get('landmark_map', {}),
+            frames=pose_data
+        )
+
+    def angle(self, name: str) -> np.ndarray:
+        """Per-frame series for a named angle (default-filled if undetected)"""
+        series = self.angles.get(name)
+        if series is None:
+            return np.full(self.landmarks.shape[0], self._DEFAULT_ANGLE, dtype=np.float32)
+        return series
+
+    def column(self, landmark_name: str, axis: int) -> np.ndarray:
+        """Per-frame series for one coordinate of a named landmark"""
+        return self.landmarks[:, self.landmark_map[landmark_name], axis]
 
 
 class BaseAnalyzer:
     """
     Base class for exercise analyzers with ML model support.
     """
-    
-    def __init__(self):
-        """Initialize base analyzer with ML trainer"""
-        self.model_trainer = ModelTrainer()
+
+    # Shared cache of model_exists lookups: exercise_type -> (timestamp, exists).
+    # Avoids a filesystem stat on every inference.
+    _model_exists_cache: Dict[str, tuple] = {}
+    _model_exists_ttl = 5.0  # seconds
+
+    def __init__(self, model_trainer: Optional[ModelTrainer] = None):
+        """Initialize base analyzer with the shared ML trainer"""
+        self.model_trainer = model_trainer if model_trainer is not None else get_trainer()
         self.use_ml = True  # Flag to enable/disable ML
+
+    def _model_available(self, exercise_type: str) -> bool:
+        """Check for a trained model, caching the result briefly"""
+        now = time.monotonic()
+        cached = self._model_exists_cache.get(exercise_type)
+        if cached is not None and now - cached[0] < self._model_exists_ttl:
+            return cached[1]
+
+        exists = self.model_trainer.model_exists(exercise_type)
+        BaseAnalyzer._model_exists_cache[exercise_type] = (now, exists)
+        return exists
+
+    @classmethod
+    def invalidate_model_cache(cls, exercise_type: Optional[str] = None) -> None:
+        """Drop cached model_exists results (e.g. after training a new model)"""
+        if exercise_type is None:
+            cls._model_exists_cache.clear()
+        else:
+            cls._model_exists_cache.pop(exercise_type, None)
     
     @staticmethod
     def get_video_requirements() -> List[str]:
@@ -27,29 +109,45 @@ class BaseAnalyzer:
             "Use a stable camera with good lighting."
         ]
     
-    def analyze_form(self, pose_data: List[Dict], exercise_type: str) -> Dict:
+    def analyze_form(self, pose_data, exercise_type: str) -> Dict:
         """
         Analyze form using ML model if available, otherwise use rule-based.
-        
+
         Args:
-            pose_data: List of frame pose data dictionaries
+            pose_data: List of frame pose data dictionaries, or a
+                PoseBatch built from one
             exercise_type: Type of exercise (e.g., 'pull_up')
-            
+
         Returns:
             Dictionary with score and feedback
         """
+        # Callers that already hold the SoA batch can pass it directly;
+        # the original frames ride along for the feature-extraction path
+        if isinstance(pose_data, PoseBatch):
+            batch, pose_data = pose_data, pose_data.frames
+            self._batch_cache = (pose_data, batch)
+
+        # Nothing to batch or score without frames; the rule-based path
+        # handles the empty case
+        if not pose_data:
+            return self._rule_based_analysis(pose_data)
+
         # Try ML model first
-        if self.use_ml and self.model_trainer.model_exists(exercise_type):
+        if self.use_ml and self._model_available(exercise_type):
             try:
-                score = self.model_trainer.predict(exercise_type, pose_data)
+                # Share the batch's angle columns with the feature
+                # extractor so ML and rule paths do one angle pass total
+                batch = self.pose_batch(pose_data)
+                score = self.model_trainer.predict(
+                    exercise_type, pose_data, angle_series=batch.angles)
                 feedback = self._generate_feedback_from_score(score, pose_data)
                 return {
                     'score': score,
                     'feedback': feedback,
                     'method': 'ml_model'
                 }
-            except Exception as e:
-                print(f"ML prediction failed: {e}, falling back to rule-based")
+            except (ModelNotFoundError, KeyError, ValueError) as e:
+                logger.warning("ML prediction failed: %s, falling back to rule-based", e)
         
         # Fallback to rule-based analysis
         return self._rule_based_analysis(pose_data)
@@ -76,6 +174,26 @@ class BaseAnalyzer:
         
         return feedback
     
+    def pose_batch(self, pose_data: List[Dict]) -> PoseBatch:
+        """
+        Return the PoseBatch for a pose_data sequence.
+
+        The batch is cached per sequence so every check (and the caller
+        that pre-builds it) reuses one conversion instead of re-iterating
+        the frame dictionaries.
+        """
+        cached = getattr(self, '_batch_cache', None)
+        if cached is not None and cached[0] is pose_data:
+            return cached[1]
+
+        batch = PoseBatch.from_pose_data(pose_data)
+        self._batch_cache = (pose_data, batch)
+        return batch
+
+    def _stack_landmarks(self, pose_data: List[Dict]) -> np.ndarray:
+        """Stacked (frames, landmarks, 3) array for a pose_data sequence"""
+        return self.pose_batch(pose_data).landmarks
+
     def _analyze_specific_issues(self, pose_data: List[Dict]) -> List[str]:
         """
         Analyze specific form issues from pose data.
@@ -83,6 +201,44 @@ class BaseAnalyzer:
         """
         return []
     
+    def _apply_rules(self, pose_data: List[Dict], rules) -> Dict:
+        """
+        Evaluate table-driven form rules against the pose batch.
+
+        Each rule is a (check, penalty, message) tuple; check receives the
+        PoseBatch and returns a truthy value when the fault is present
+        (returning a string overrides the static message).
+        """
+        if not pose_data:
+            return {'score': 0, 'feedback': ['No pose data available'], 'method': 'rule_based'}
+
+        batch = self.pose_batch(pose_data)
+        feedback = []
+        score = 100
+
+        for check, penalty, message in rules:
+            result = check(batch)
+            if result:
+                feedback.append(result if isinstance(result, str) else message)
+                score -= penalty
+
+        score = max(0, score)
+        if not feedback:
+            feedback.append("Good form detected!")
+
+        if score >= 90:
+            feedback.append("Excellent overall form!")
+        elif score >= 70:
+            feedback.append("Good form, but with room for minor improvements.")
+        else:
+            feedback.append("Form needs significant work. Focus on the feedback provided.")
+
+        return {
+            'score': score,
+            'feedback': feedback,
+            'method': 'rule_based'
+        }
+
     def _rule_based_analysis(self, pose_data: List[Dict]) -> Dict:
         """
         Rule-based analysis as fallback.
@@ -1,3 +1,4 @@
+import numpy as np
 from .base_analyzer import BaseAnalyzer
 from typing import List, Dict
 
@@ -32,13 +33,13 @@ class BridgeAnalyzer(BaseAnalyzer):
         # Placeholder for specific feedback for Bridges
         specific_feedback = []
         # Example: Check for hip drop (very basic)
-        if pose_data:
-            # Assuming 'left_hip' and 'right_hip' landmarks are present
-            # This is a highly simplified example, real analysis would be more complex
-            start_hip_y = pose_data[0]["landmarks"][pose_data[0]["landmark_map"]["left_hip"]][1] if "landmark_map" in pose_data[0] else None
-            end_hip_y = pose_data[-1]["landmarks"][pose_data[-1]["landmark_map"]["left_hip"]][1] if "landmark_map" in pose_data[-1] else None
-            
-            if start_hip_y and end_hip_y and (start_hip_y - end_hip_y) < 0.05: # Small change in y means little hip movement
+        if pose_data and "landmark_map" in pose_data[0]:
+            # The landmark map is constant across a video, so resolve the
+            # integer index once and slice the stacked landmark array
+            left_hip_idx = pose_data[0]["landmark_map"]["left_hip"]
+            hip_y = self._stack_landmarks(pose_data)[:, left_hip_idx, 1]
+
+            if np.ptp(hip_y) < 0.05: # Small y range means little hip movement
                 specific_feedback.append("Increase hip extension for a full range of motion.")
 
         return specific_feedback
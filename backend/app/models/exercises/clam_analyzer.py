@@ -1,6 +1,33 @@
+import numpy as np
 from .base_analyzer import BaseAnalyzer
 from typing import List, Dict
 
+try:
+    from numba import njit
+except ImportError:
+    # Numba is optional; without it the loop runs interpreted
+    def njit(*args, **kwargs):
+        def decorator(func):
+            return func
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return decorator
+
+
+@njit(cache=True)
+def _detect_torso_rotation(l_shoulder_y, r_shoulder_y, l_hip_y, r_hip_y) -> bool:
+    """
+    Return True if shoulder rotation significantly exceeds hip rotation
+    in any frame relative to the first frame.
+    """
+    shoulder_diff = np.abs((l_shoulder_y - r_shoulder_y) - (l_shoulder_y[0] - r_shoulder_y[0]))
+    hip_diff = np.abs((l_hip_y - r_hip_y) - (l_hip_y[0] - r_hip_y[0]))
+
+    # Branchless mask over all frames: shoulder rotation significantly
+    # larger than hip rotation anywhere flags the clip
+    return bool(np.any((shoulder_diff > 0.05) & (shoulder_diff > hip_diff * 1.5)))
+
+
 class ClamAnalyzer(BaseAnalyzer):
     def __init__(self):
         super().__init__()
@@ -29,40 +56,27 @@ class ClamAnalyzer(BaseAnalyzer):
         }
 
     def _analyze_specific_issues(self, pose_data: List[Dict]) -> List[str]:
-        # Placeholder for specific feedback for Clams
+        # Check for torso rotation: shoulders rotating significantly
+        # relative to hips compared to the first frame
         specific_feedback = []
-        # Example: Check for torso rotation (very basic)
-        if pose_data:
-            # Assuming shoulder and hip landmarks are present
-            # This is a highly simplified example, real analysis would be more complex
-            # Check if shoulders rotate significantly relative to hips
-            if "landmark_map" in pose_data[0] and \
-               pose_data[0]["landmark_map"].get("left_shoulder") is not None and \
-               pose_data[0]["landmark_map"].get("right_shoulder") is not None and \
-               pose_data[0]["landmark_map"].get("left_hip") is not None and \
-               pose_data[0]["landmark_map"].get("right_hip") is not None:
-
-                # Get initial shoulder and hip positions (simplified to y-coordinates for rotation check)
-                initial_l_shoulder_y = pose_data[0]["landmarks"][pose_data[0]["landmark_map"]["left_shoulder"]][1]
-                initial_r_shoulder_y = pose_data[0]["landmarks"][pose_data[0]["landmark_map"]["right_shoulder"]][1]
-                initial_l_hip_y = pose_data[0]["landmarks"][pose_data[0]["landmark_map"]["left_hip"]][1]
-                initial_r_hip_y = pose_data[0]["landmarks"][pose_data[0]["landmark_map"]["right_hip"]][1]
-
-                # Check for significant difference in y-coordinates between shoulders and hips over time
-                # This is a crude way to detect torso rotation for demonstration
-                for frame in pose_data[1:]:
-                    current_l_shoulder_y = frame["landmarks"][frame["landmark_map"]["left_shoulder"]][1]
-                    current_r_shoulder_y = frame["landmarks"][frame["landmark_map"]["right_shoulder"]][1]
-                    current_l_hip_y = frame["landmarks"][frame["landmark_map"]["left_hip"]][1]
-                    current_r_hip_y = frame["landmarks"][frame["landmark_map"]["right_hip"]][1]
-
-                    shoulder_diff = abs((current_l_shoulder_y - current_r_shoulder_y) - (initial_l_shoulder_y - initial_r_shoulder_y))
-                    hip_diff = abs((current_l_hip_y - current_r_hip_y) - (initial_l_hip_y - initial_r_hip_y))
-
-                    # If shoulder rotation is significantly more than hip rotation, suggest torso stability
-                    if shoulder_diff > 0.05 and shoulder_diff > hip_diff * 1.5: # Arbitrary thresholds
-                        specific_feedback.append("Avoid rotating your torso; keep your core stable.")
-                        break
+        if len(pose_data) < 2:
+            return specific_feedback
+
+        landmark_map = pose_data[0].get("landmark_map", {})
+        if any(landmark_map.get(name) is None for name in
+               ("left_shoulder", "right_shoulder", "left_hip", "right_hip")):
+            return specific_feedback
+
+        # Build the four y-coordinate columns once, then run the per-frame
+        # threshold loop in compiled code
+        landmarks = self._stack_landmarks(pose_data)
+        l_shoulder_y = np.ascontiguousarray(landmarks[:, landmark_map["left_shoulder"], 1])
+        r_shoulder_y = np.ascontiguousarray(landmarks[:, landmark_map["right_shoulder"], 1])
+        l_hip_y = np.ascontiguousarray(landmarks[:, landmark_map["left_hip"], 1])
+        r_hip_y = np.ascontiguousarray(landmarks[:, landmark_map["right_hip"], 1])
+
+        if _detect_torso_rotation(l_shoulder_y, r_shoulder_y, l_hip_y, r_hip_y):
+            specific_feedback.append("Avoid rotating your torso; keep your core stable.")
 
         return specific_feedback
 
@@ -2,7 +2,8 @@
 Machine learning modules for exercise form analysis.
 """
 from .feature_extractor import FeatureExtractor
-from .model_trainer import ModelTrainer
+from .model_trainer import ModelTrainer, ModelNotFoundError
+from .trainer_factory import get_trainer
 
-__all__ = ['FeatureExtractor', 'ModelTrainer']
+__all__ = ['FeatureExtractor', 'ModelTrainer', 'ModelNotFoundError', 'get_trainer']
 
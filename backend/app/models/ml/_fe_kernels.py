@@ -0,0 +1,164 @@
+"""
+Numeric kernels for FeatureExtractor.
+
+Each kernel takes pre-packed float32 tensors and returns contiguous
+float32 results. With numba installed the loop versions are JIT-compiled
+to native code; otherwise the vectorized NumPy equivalents below are
+used, so the extractor works identically either way.
+"""
+import math
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    njit = None
+
+
+def _frame_stats_loop(angles):
+    """Per-joint min/max/mean/std/range over a (frames, joints) tensor"""
+    n, j = angles.shape
+    out = np.empty((j, 5), dtype=np.float32)
+    for k in range(j):
+        mn = angles[0, k]
+        mx = angles[0, k]
+        total = 0.0
+        for i in range(n):
+            v = angles[i, k]
+            if v < mn:
+                mn = v
+            if v > mx:
+                mx = v
+            total += v
+        mean = total / n
+        var = 0.0
+        for i in range(n):
+            d = angles[i, k] - mean
+            var += d * d
+        out[k, 0] = mn
+        out[k, 1] = mx
+        out[k, 2] = mean
+        out[k, 3] = (var / n) ** 0.5
+        out[k, 4] = mx - mn
+    return out
+
+
+def _frame_stats_numpy(angles):
+    return np.stack([
+        angles.min(axis=0),
+        angles.max(axis=0),
+        angles.mean(axis=0),
+        angles.std(axis=0),
+        np.ptp(angles, axis=0)
+    ], axis=1).astype(np.float32)
+
+
+def _velocity_stats_loop(coords):
+    """
+    Per-landmark velocity mean/std/max plus overall smoothness for a
+    (frames, landmarks, 2) coordinate tensor.
+    """
+    n, k, _ = coords.shape
+    m = n - 1
+    vels = np.empty((m, k), dtype=np.float32)
+    for i in range(m):
+        for j in range(k):
+            dx = coords[i + 1, j, 0] - coords[i, j, 0]
+            dy = coords[i + 1, j, 1] - coords[i, j, 1]
+            vels[i, j] = (dx * dx + dy * dy) ** 0.5
+
+    out = np.empty((k, 3), dtype=np.float32)
+    for j in range(k):
+        total = 0.0
+        mx = vels[0, j]
+        for i in range(m):
+            v = vels[i, j]
+            total += v
+            if v > mx:
+                mx = v
+        mean = total / m
+        var = 0.0
+        for i in range(m):
+            d = vels[i, j] - mean
+            var += d * d
+        out[j, 0] = mean
+        out[j, 1] = (var / m) ** 0.5
+        out[j, 2] = mx
+
+    total = 0.0
+    for i in range(m):
+        for j in range(k):
+            total += vels[i, j]
+    gmean = total / (m * k)
+    gvar = 0.0
+    for i in range(m):
+        for j in range(k):
+            d = vels[i, j] - gmean
+            gvar += d * d
+    smoothness = (gvar / (m * k)) ** 0.5
+
+    return out, smoothness
+
+
+def _velocity_stats_numpy(coords):
+    vels = np.linalg.norm(np.diff(coords, axis=0), axis=2)
+    out = np.stack([
+        vels.mean(axis=0),
+        vels.std(axis=0),
+        vels.max(axis=0)
+    ], axis=1).astype(np.float32)
+    return out, float(vels.std())
+
+
+def _alignment_stats_loop(shoulder, hip, ankle):
+    """
+    Mean/min/std of shoulder-hip-ankle alignment scores for (frames, 2)
+    coordinate tensors. Uses atan2(|cross|, dot), which stays accurate
+    for the near-collinear vectors a straight body line produces.
+    """
+    n = shoulder.shape[0]
+    scores = np.empty(n, dtype=np.float32)
+    for i in range(n):
+        v1x = hip[i, 0] - shoulder[i, 0]
+        v1y = hip[i, 1] - shoulder[i, 1]
+        v2x = ankle[i, 0] - hip[i, 0]
+        v2y = ankle[i, 1] - hip[i, 1]
+        cross = v1x * v2y - v1y * v2x
+        dot = v1x * v2x + v1y * v2y
+        angle_deg = math.degrees(math.atan2(abs(cross), dot))
+        scores[i] = 1 - abs(angle_deg - 180.0) / 180.0
+
+    mn = scores[0]
+    total = 0.0
+    for i in range(n):
+        if scores[i] < mn:
+            mn = scores[i]
+        total += scores[i]
+    mean = total / n
+    var = 0.0
+    for i in range(n):
+        d = scores[i] - mean
+        var += d * d
+    return mean, mn, (var / n) ** 0.5
+
+
+def _alignment_stats_numpy(shoulder, hip, ankle):
+    vec1 = hip - shoulder
+    vec2 = ankle - hip
+    cross = vec1[:, 0] * vec2[:, 1] - vec1[:, 1] * vec2[:, 0]
+    dot = (vec1 * vec2).sum(axis=1)
+    angles_deg = np.degrees(np.arctan2(np.abs(cross), dot))
+    scores = 1 - np.abs(angles_deg - 180) / 180
+    return float(scores.mean()), float(scores.min()), float(scores.std())
+
+
+if NUMBA_AVAILABLE:
+    frame_stats = njit(cache=True, fastmath=True)(_frame_stats_loop)
+    velocity_stats = njit(cache=True, fastmath=True)(_velocity_stats_loop)
+    alignment_stats = njit(cache=True, fastmath=True)(_alignment_stats_loop)
+else:
+    frame_stats = _frame_stats_numpy
+    velocity_stats = _velocity_stats_numpy
+    alignment_stats = _alignment_stats_numpy
@@ -3,27 +3,48 @@ Data collection module for gathering labeled training data.
 Stores user feedback and video analysis results for model training.
 """
 import os
-import json
-import pickle
+import numpy as np
+import orjson
 from typing import List, Dict, Optional
 from datetime import datetime
 
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+    print("Warning: pyarrow not available. Falling back to JSONL storage.")
+
 
 class DataCollector:
     """
     Collects and manages labeled training data for ML models.
+
+    Examples are stored as a Parquet dataset (one small file per example
+    under ``{exercise_type}_data/``) so statistics queries can read just
+    the ``score`` column instead of decoding every nested pose frame.
+    Falls back to JSONL when pyarrow is not installed.
     """
-    
+
     def __init__(self, data_dir: str = "models/ml/training_data"):
         """
         Initialize data collector.
-        
+
         Args:
             data_dir: Directory to store training data
         """
         self.data_dir = data_dir
         os.makedirs(data_dir, exist_ok=True)
-    
+
+    def _dataset_dir(self, exercise_type: str) -> str:
+        """Directory holding the Parquet dataset for an exercise type"""
+        return os.path.join(self.data_dir, f"{exercise_type}_data")
+
+    def _jsonl_path(self, exercise_type: str) -> str:
+        """Legacy JSONL file path for an exercise type"""
+        return os.path.join(self.data_dir, f"{exercise_type}_data.jsonl")
+
     def save_training_example(
         self,
         exercise_type: str,
@@ -34,19 +55,19 @@ class DataCollector:
     ) -> str:
         """
         Save a labeled training example.
-        
+
         Args:
             exercise_type: Type of exercise
             pose_data: Pose data from video analysis
             score: Form score (0-100) - can be from user feedback or expert rating
             user_feedback: Optional user-provided feedback text
             metadata: Optional additional metadata (video path, timestamp, etc.)
-            
+
         Returns:
             ID of saved example
         """
         example_id = f"{exercise_type}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
-        
+
         example = {
             'id': example_id,
             'exercise_type': exercise_type,
@@ -56,65 +77,154 @@ class DataCollector:
             'metadata': metadata or {},
             'timestamp': datetime.now().isoformat()
         }
-        
-        # Save to exercise-specific file
-        exercise_file = os.path.join(self.data_dir, f"{exercise_type}_data.jsonl")
-        
-        with open(exercise_file, 'a') as f:
-            f.write(json.dumps(example) + '\n')
-        
+
+        if not PYARROW_AVAILABLE:
+            with open(self._jsonl_path(exercise_type), 'ab') as f:
+                f.write(orjson.dumps(
+                    example, option=orjson.OPT_SERIALIZE_NUMPY) + b'\n')
+            return example_id
+
+        self._migrate_legacy_jsonl(exercise_type)
+        dataset_dir = self._dataset_dir(exercise_type)
+        os.makedirs(dataset_dir, exist_ok=True)
+        self._write_parquet_example(dataset_dir, example)
+
         return example_id
-    
+
+    @staticmethod
+    def _write_parquet_example(dataset_dir: str, example: Dict) -> None:
+        """
+        Write one example as a single-row Parquet file.
+
+        Parquet files cannot be appended to once closed, so each example
+        gets its own file and loads read the directory as one dataset.
+        The nested pose frames and metadata are stored as orjson-encoded
+        binary columns: they are only ever consumed whole, and a flat
+        binary column keeps the schema identical across files while the
+        scalar columns (notably ``score``) stay individually readable.
+        """
+        table = pa.table({
+            'id': [example['id']],
+            'exercise_type': [example['exercise_type']],
+            'score': pa.array([float(example['score'])], type=pa.float64()),
+            # Explicit string type: a None here (the default) would
+            # otherwise infer a null-typed column that cannot be unified
+            # with string-typed files at dataset read time
+            'user_feedback': pa.array(
+                [example['user_feedback']], type=pa.string()),
+            'timestamp': [example['timestamp']],
+            'pose_data': pa.array(
+                [orjson.dumps(example['pose_data'],
+                              option=orjson.OPT_SERIALIZE_NUMPY)],
+                type=pa.binary()),
+            'metadata': pa.array(
+                [orjson.dumps(example['metadata'],
+                              option=orjson.OPT_SERIALIZE_NUMPY)],
+                type=pa.binary()),
+        })
+        pq.write_table(table, os.path.join(dataset_dir, f"{example['id']}.parquet"))
+
+    def _migrate_legacy_jsonl(self, exercise_type: str) -> None:
+        """One-shot migration of a legacy JSONL file into the Parquet dataset"""
+        jsonl_path = self._jsonl_path(exercise_type)
+        if not os.path.exists(jsonl_path):
+            return
+
+        dataset_dir = self._dataset_dir(exercise_type)
+        os.makedirs(dataset_dir, exist_ok=True)
+
+        with open(jsonl_path, 'rb') as f:
+            for line in f.read().splitlines():
+                if line:
+                    self._write_parquet_example(dataset_dir, orjson.loads(line))
+
+        # Keep the original around (renamed) rather than deleting data
+        os.replace(jsonl_path, jsonl_path + '.migrated')
+
     def load_training_data(self, exercise_type: str) -> List[Dict]:
         """
         Load all training examples for an exercise type.
-        
+
         Args:
             exercise_type: Type of exercise
-            
+
         Returns:
             List of training examples
         """
-        exercise_file = os.path.join(self.data_dir, f"{exercise_type}_data.jsonl")
-        
-        if not os.path.exists(exercise_file):
+        if not PYARROW_AVAILABLE:
+            jsonl_path = self._jsonl_path(exercise_type)
+            if not os.path.exists(jsonl_path):
+                return []
+            # Decode the whole file with orjson's C parser; one read plus
+            # splitlines avoids per-line strip/decode overhead
+            with open(jsonl_path, 'rb') as f:
+                return [orjson.loads(line) for line in f.read().splitlines() if line]
+
+        self._migrate_legacy_jsonl(exercise_type)
+        dataset_dir = self._dataset_dir(exercise_type)
+        if not os.path.isdir(dataset_dir):
             return []
-        
+
+        table = pq.read_table(dataset_dir)
+        columns = table.to_pydict()
+
         examples = []
-        with open(exercise_file, 'r') as f:
-            for line in f:
-                if line.strip():
-                    examples.append(json.loads(line))
-        
+        for i in range(table.num_rows):
+            examples.append({
+                'id': columns['id'][i],
+                'exercise_type': columns['exercise_type'][i],
+                'pose_data': orjson.loads(columns['pose_data'][i]),
+                'score': columns['score'][i],
+                'user_feedback': columns['user_feedback'][i],
+                'metadata': orjson.loads(columns['metadata'][i]),
+                'timestamp': columns['timestamp'][i],
+            })
         return examples
-    
+
+    def _load_scores(self, exercise_type: str) -> List[float]:
+        """
+        Load only the score column for an exercise type.
+
+        With Parquet this reads a single column from the dataset and
+        skips decoding the (much larger) nested pose data entirely.
+        """
+        if PYARROW_AVAILABLE:
+            self._migrate_legacy_jsonl(exercise_type)
+            dataset_dir = self._dataset_dir(exercise_type)
+            if not os.path.isdir(dataset_dir):
+                return []
+            return pq.read_table(dataset_dir, columns=['score']).column('score').to_pylist()
+
+        return [ex['score'] for ex in self.load_training_data(exercise_type)]
+
     def get_training_statistics(self, exercise_type: str) -> Dict:
         """
         Get statistics about collected training data.
-        
+
         Args:
             exercise_type: Type of exercise
-            
+
         Returns:
             Dictionary with statistics
         """
-        examples = self.load_training_data(exercise_type)
-        
-        if not examples:
+        raw_scores = self._load_scores(exercise_type)
+
+        if not raw_scores:
             return {
                 'count': 0,
                 'avg_score': 0,
                 'min_score': 0,
                 'max_score': 0
             }
-        
-        scores = [ex['score'] for ex in examples]
-        
+
+        # Single-pass NumPy reductions; the old generator-expression std
+        # recomputed the mean inside the loop for every score
+        scores = np.fromiter(raw_scores, dtype=np.float64, count=len(raw_scores))
+
         return {
-            'count': len(examples),
-            'avg_score': sum(scores) / len(scores),
-            'min_score': min(scores),
-            'max_score': max(scores),
-            'std_score': (sum((s - sum(scores)/len(scores))**2 for s in scores) / len(scores))**0.5
+            'count': scores.size,
+            'avg_score': float(scores.mean()),
+            'min_score': float(scores.min()),
+            'max_score': float(scores.max()),
+            'std_score': float(scores.std())
         }
-
@@ -1,33 +1,37 @@
 import numpy as np
-from typing import Dict, List
+from typing import Dict, List, Tuple
+from .feature_extractor import FeatureExtractor
 
 class ExerciseClassifier:
     def __init__(self, model_path: str = None):
         # For now, this is a placeholder. In a real scenario, load your trained model here.
         # self.model = load_model(model_path)
-        pass
+        self.feature_extractor = FeatureExtractor()
 
-    def classify_exercise(self, pose_data: List[Dict]) -> str:
-        """Placeholder for classifying an exercise based on pose data."""
-        # In a real implementation, this would feed pose_data through the trained model
-        # and return the predicted exercise type (e.g., 'bridge', 'clam').
-        
-        # For demo purposes, let's just return a hardcoded exercise type or a simple heuristic.
-        # A more sophisticated placeholder could analyze some basic landmark movements.
-        
-        if not pose_data:
+    def classify_exercise(self, features: np.ndarray, n_frames: int) -> str:
+        """Placeholder for classifying an exercise from an extracted feature vector."""
+        # In a real implementation, this would feed the features through the trained
+        # model and return the predicted exercise type (e.g., 'bridge', 'clam').
+        # Taking the already-extracted vector (rather than raw pose_data) means
+        # classification and downstream scoring share one feature pass.
+
+        if n_frames == 0:
             return "unknown"
 
-        # Example heuristic: if a certain hip landmark moves significantly, it might be a bridge.
-        # This is very basic and just for demonstration.
-        # In a real model, feature extraction from pose_data would happen before prediction.
-        
-        # Let's mock a simple classification based on the number of frames or some other simple criteria
-        # In a real scenario, you'd extract features from the pose_data (e.g., joint angles over time,
-        # displacement of key points) and feed them to your trained model.
-        
         # For now, a very simple mock: if there are many frames, assume it's a bridge, else clam
-        if len(pose_data) > 20: # Arbitrary threshold
+        if n_frames > 20: # Arbitrary threshold
             return "bridge"
         else:
             return "clam"
+
+    def classify_and_extract(self, pose_data: List[Dict]) -> Tuple[str, np.ndarray]:
+        """
+        Extract features once and classify from them.
+
+        Returns:
+            (exercise_type, features) so callers can reuse the same
+            feature vector for per-class scoring without a second
+            extraction pass.
+        """
+        features = self.feature_extractor.extract_features(pose_data)
+        return self.classify_exercise(features, len(pose_data)), features
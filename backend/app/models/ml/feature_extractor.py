@@ -4,6 +4,7 @@ Feature extraction module for converting MediaPipe pose data into ML-ready featu
 import numpy as np
 from typing import List, Dict, Optional
 from collections import deque
+from ._fe_kernels import frame_stats, velocity_stats, alignment_stats
 
 
 class FeatureExtractor:
@@ -12,200 +13,253 @@ class FeatureExtractor:
     Converts raw MediaPipe landmarks and angles into meaningful features.
     """
     
+    # Landmarks tracked for velocity/temporal features
+    KEY_LANDMARKS = ('left_wrist', 'left_elbow', 'left_shoulder',
+                     'left_hip', 'left_knee', 'left_ankle')
+
+    # Left/right angle pairs averaged into one series per joint
+    ANGLE_PAIRS = (
+        ('left_elbow', 'right_elbow'),
+        ('left_shoulder', 'right_shoulder'),
+        ('left_hip', 'right_hip'),
+        ('left_knee', 'right_knee'),
+    )
+
+    # Last extraction, shared across instances (classifier and trainer
+    # each hold their own extractor) so one request never extracts the
+    # same sequence twice. Keyed by list identity, like the analyzers'
+    # per-sequence PoseBatch cache.
+    _extraction_cache = None  # (pose_data, features)
+
     def __init__(self, window_size: int = 10):
         """
         Initialize feature extractor.
-        
+
         Args:
             window_size: Number of frames to use for temporal features
         """
         self.window_size = window_size
     
-    def extract_features(self, pose_data: List[Dict]) -> np.ndarray:
+    def extract_features(
+        self,
+        pose_data: List[Dict],
+        angle_series: Optional[Dict[str, np.ndarray]] = None
+    ) -> np.ndarray:
         """
         Extract features from a sequence of pose data frames.
-        
+
         Args:
             pose_data: List of frame dictionaries with 'landmarks' and 'angles'
-            
+            angle_series: Optional precomputed per-angle (frames,) arrays
+                (e.g. from an analyzer's PoseBatch) so the angle columns
+                are not rebuilt from the frame dicts
+
         Returns:
             Feature vector as numpy array
         """
         if not pose_data:
-            return np.zeros(self._get_feature_count())
-        
-        features = []
-        
-        # Extract frame-level features
-        frame_features = self._extract_frame_features(pose_data)
-        features.extend(frame_features)
-        
-        # Extract temporal features (movement patterns)
-        temporal_features = self._extract_temporal_features(pose_data)
-        features.extend(temporal_features)
-        
-        # Extract statistical features
-        statistical_features = self._extract_statistical_features(pose_data)
-        features.extend(statistical_features)
-        
-        return np.array(features)
+            return np.zeros(self._get_feature_count(), dtype=np.float32)
+
+        cached = FeatureExtractor._extraction_cache
+        if cached is not None and cached[0] is pose_data:
+            return cached[1]
+
+        # One float32 allocation; each helper fills its own slice in
+        # place, so there is no growing list and no final copy
+        out = np.empty(self._get_feature_count(), dtype=np.float32)
+        n_frame = 5 * len(self.ANGLE_PAIRS)
+        n_temporal = 3 * len(self.KEY_LANDMARKS) + 1
+
+        # Frame-level features
+        self._extract_frame_features(pose_data, out[:n_frame], angle_series)
+
+        # Temporal features (movement patterns)
+        self._extract_temporal_features(pose_data, out[n_frame:n_frame + n_temporal])
+
+        # Statistical features
+        self._extract_statistical_features(
+            pose_data, out[n_frame + n_temporal:], angle_series)
+
+        FeatureExtractor._extraction_cache = (pose_data, out)
+        return out
+
+    def extract_features_from_arrays(
+        self,
+        landmarks: np.ndarray,
+        angle_series: Dict[str, np.ndarray],
+        landmark_map: Dict[str, int]
+    ) -> np.ndarray:
+        """
+        Extract features directly from stacked arrays, skipping the
+        list-of-dict walk entirely.
+
+        Args:
+            landmarks: (frames, landmarks, 3) coordinate tensor
+            angle_series: angle name -> (frames,) array (undetected
+                angles are treated as default-filled at 180)
+            landmark_map: landmark name -> index into the tensor
+
+        Returns:
+            Feature vector as numpy array
+        """
+        n = int(landmarks.shape[0])
+        if n == 0:
+            return np.zeros(self._get_feature_count(), dtype=np.float32)
+
+        out = np.empty(self._get_feature_count(), dtype=np.float32)
+        n_frame = 5 * len(self.ANGLE_PAIRS)
+        n_temporal = 3 * len(self.KEY_LANDMARKS) + 1
+
+        # Frame-level features straight from the angle columns
+        self._frame_features_from_series(angle_series, n, out[:n_frame])
+
+        # Temporal features from the coordinate tensor
+        temporal = out[n_frame:n_frame + n_temporal]
+        temporal[:] = 0
+        present = [name for name in self.KEY_LANDMARKS if name in landmark_map]
+        if present and n >= 2:
+            key_idx = np.array([landmark_map[name] for name in present], dtype=np.intp)
+            coords = np.ascontiguousarray(
+                landmarks[:, key_idx, :2].astype(np.float32, copy=False))
+            vel_stats, smoothness = velocity_stats(coords)
+            col = {name: j for j, name in enumerate(present)}
+            for k, landmark_name in enumerate(self.KEY_LANDMARKS):
+                if landmark_name in col:
+                    temporal[3 * k:3 * k + 3] = vel_stats[col[landmark_name]]
+            temporal[-1] = smoothness
+
+        # Statistical features
+        stats = out[n_frame + n_temporal:]
+        stats[:] = 0
+        shoulder_idx = landmark_map.get('left_shoulder', 11)
+        hip_idx = landmark_map.get('left_hip', 23)
+        ankle_idx = landmark_map.get('left_ankle', 27)
+        if landmarks.shape[1] > max(shoulder_idx, hip_idx, ankle_idx, 27):
+            arr = landmarks.astype(np.float32, copy=False)
+            stats[0], stats[1], stats[2] = alignment_stats(
+                np.ascontiguousarray(arr[:, shoulder_idx, :2]),
+                np.ascontiguousarray(arr[:, hip_idx, :2]),
+                np.ascontiguousarray(arr[:, ankle_idx, :2]))
+
+        if angle_series:
+            stacked = np.stack(list(angle_series.values()))
+            stats[3] = stacked.max() - stacked.min()  # Total range
+            stats[4] = n                              # Number of frames
+            stats[5] = len(angle_series)              # Detected joints
+        stats[6] = self._symmetry_from_series(angle_series, n)
+
+        return out
     
-    def _extract_frame_features(self, pose_data: List[Dict]) -> List[float]:
-        """Extract features from individual frames"""
-        features = []
-        
-        # Get key angles from all frames
-        all_angles = {
-            'elbow': [],
-            'shoulder': [],
-            'hip': [],
-            'knee': []
-        }
-        
-        for frame in pose_data:
+    def _extract_frame_features(
+        self,
+        pose_data: List[Dict],
+        out: np.ndarray,
+        angle_series: Optional[Dict[str, np.ndarray]] = None
+    ) -> None:
+        """Extract features from individual frames into the output slice"""
+        if angle_series is not None:
+            self._frame_features_from_series(angle_series, len(pose_data), out)
+            return
+
+        # One pass over the frames fills a preallocated (frames, joints)
+        # buffer of left/right-averaged angles
+        buf = np.empty((len(pose_data), len(self.ANGLE_PAIRS)), dtype=np.float32)
+        for i, frame in enumerate(pose_data):
             angles = frame.get('angles', {})
-            
-            # Average left and right angles
-            left_elbow = angles.get('left_elbow', 180)
-            right_elbow = angles.get('right_elbow', 180)
-            all_angles['elbow'].append((left_elbow + right_elbow) / 2)
-            
-            left_shoulder = angles.get('left_shoulder', 180)
-            right_shoulder = angles.get('right_shoulder', 180)
-            all_angles['shoulder'].append((left_shoulder + right_shoulder) / 2)
-            
-            left_hip = angles.get('left_hip', 180)
-            right_hip = angles.get('right_hip', 180)
-            all_angles['hip'].append((left_hip + right_hip) / 2)
-            
-            left_knee = angles.get('left_knee', 180)
-            right_knee = angles.get('right_knee', 180)
-            all_angles['knee'].append((left_knee + right_knee) / 2)
-        
-        # Key angle statistics
-        for angle_type in ['elbow', 'shoulder', 'hip', 'knee']:
-            if all_angles[angle_type]:
-                angles_array = np.array(all_angles[angle_type])
-                features.extend([
-                    np.min(angles_array),  # Minimum angle (deepest position)
-                    np.max(angles_array),  # Maximum angle (top position)
-                    np.mean(angles_array),  # Average angle
-                    np.std(angles_array),   # Variability
-                    np.max(angles_array) - np.min(angles_array)  # Range of motion
-                ])
-            else:
-                features.extend([0, 0, 0, 0, 0])
-        
-        return features
+            for j, (left, right) in enumerate(self.ANGLE_PAIRS):
+                buf[i, j] = (angles.get(left, 180) + angles.get(right, 180)) / 2
+
+        # Per-joint statistics - min (deepest position), max (top
+        # position), mean, variability and range of motion - reduced by
+        # the compiled kernel
+        out[:] = frame_stats(buf).ravel()
+
+    def _frame_features_from_series(
+        self,
+        angle_series: Dict[str, np.ndarray],
+        n_frames: int,
+        out: np.ndarray
+    ) -> None:
+        """Frame-level statistics from precomputed angle columns"""
+        # Average each left/right pair in one vectorized op instead of
+        # re-walking the frame dicts
+        default = np.full(n_frames, 180, dtype=np.float32)
+        buf = np.stack([
+            (angle_series.get(left, default) + angle_series.get(right, default)) / 2
+            for left, right in self.ANGLE_PAIRS
+        ], axis=1)
+        out[:] = frame_stats(buf).ravel()
     
-    def _extract_temporal_features(self, pose_data: List[Dict]) -> List[float]:
-        """Extract temporal/movement pattern features"""
-        features = []
-        
+    def _extract_temporal_features(self, pose_data: List[Dict], out: np.ndarray) -> None:
+        """Extract temporal/movement pattern features into the output slice"""
+        out[:] = 0
+
         if len(pose_data) < 2:
-            return [0] * 20  # Return zeros if not enough frames
-        
+            # Leave zeros if not enough frames
+            return
+
         # Calculate velocities (change in position over time)
         landmark_map = pose_data[0].get('landmark_map', {})
-        
-        key_landmarks = ['left_wrist', 'left_elbow', 'left_shoulder', 
-                        'left_hip', 'left_knee', 'left_ankle']
-        
-        velocities = {landmark: [] for landmark in key_landmarks}
-        
-        for i in range(1, len(pose_data)):
-            prev_frame = pose_data[i-1]
-            curr_frame = pose_data[i]
-            
-            prev_landmarks = prev_frame.get('landmarks', [])
-            curr_landmarks = curr_frame.get('landmarks', [])
-            
-            for landmark_name in key_landmarks:
-                if landmark_name in landmark_map:
-                    idx = landmark_map[landmark_name]
-                    if idx < len(prev_landmarks) and idx < len(curr_landmarks):
-                        prev_pos = np.array(prev_landmarks[idx][:2])  # x, y
-                        curr_pos = np.array(curr_landmarks[idx][:2])
-                        velocity = np.linalg.norm(curr_pos - prev_pos)
-                        velocities[landmark_name].append(velocity)
-        
-        # Statistical features of velocities
-        for landmark_name in key_landmarks:
-            if velocities[landmark_name]:
-                vel_array = np.array(velocities[landmark_name])
-                features.extend([
-                    np.mean(vel_array),  # Average velocity
-                    np.std(vel_array),   # Velocity variability
-                    np.max(vel_array)    # Peak velocity
-                ])
-            else:
-                features.extend([0, 0, 0])
-        
+
+        present = [name for name in self.KEY_LANDMARKS if name in landmark_map]
+        key_idx = np.array([landmark_map[name] for name in present], dtype=np.intp)
+        max_idx = int(key_idx.max()) if present else 0
+
+        # Stack the tracked coordinates once; the kernel handles the
+        # per-landmark velocity reductions in one compiled pass
+        all_landmarks = [frame.get('landmarks', []) for frame in pose_data]
+        valid = [lms for lms in all_landmarks if len(lms) > max_idx]
+
+        if not present or len(valid) < 2:
+            return
+
+        coords = np.ascontiguousarray(
+            np.asarray(valid, dtype=np.float32)[:, key_idx, :2])  # (N, K, 2)
+        vel_stats, smoothness = velocity_stats(coords)
+
+        # Statistical features of velocities: mean (average velocity),
+        # std (variability) and max (peak) per tracked landmark; missing
+        # landmarks keep their zero slots
+        col = {name: j for j, name in enumerate(present)}
+        for k, landmark_name in enumerate(self.KEY_LANDMARKS):
+            if landmark_name in col:
+                out[3 * k:3 * k + 3] = vel_stats[col[landmark_name]]
+
         # Smoothness (low variance in velocity = smooth movement)
-        all_velocities = []
-        for vels in velocities.values():
-            all_velocities.extend(vels)
-        
-        if all_velocities:
-            features.append(np.std(all_velocities))  # Overall movement smoothness
-        else:
-            features.append(0)
-        
-        return features
+        out[-1] = smoothness
     
-    def _extract_statistical_features(self, pose_data: List[Dict]) -> List[float]:
-        """Extract statistical features across the entire sequence"""
-        features = []
-        
-        if not pose_data:
-            return [0] * 10
-        
+    def _extract_statistical_features(
+        self,
+        pose_data: List[Dict],
+        out: np.ndarray,
+        angle_series: Optional[Dict[str, np.ndarray]] = None
+    ) -> None:
+        """Extract statistical features across the sequence into the output slice"""
+        out[:] = 0
+
         # Body alignment features
         landmark_map = pose_data[0].get('landmark_map', {})
         
         # Calculate body line straightness (shoulder-hip-ankle alignment)
-        alignment_scores = []
-        
-        for frame in pose_data:
-            landmarks = frame.get('landmarks', [])
-            if len(landmarks) < 28:
-                continue
-            
-            # Get key points for alignment
-            shoulder_idx = landmark_map.get('left_shoulder', 11)
-            hip_idx = landmark_map.get('left_hip', 23)
-            ankle_idx = landmark_map.get('left_ankle', 27)
-            
-            if (shoulder_idx < len(landmarks) and 
-                hip_idx < len(landmarks) and 
-                ankle_idx < len(landmarks)):
-                
-                shoulder = np.array(landmarks[shoulder_idx][:2])
-                hip = np.array(landmarks[hip_idx][:2])
-                ankle = np.array(landmarks[ankle_idx][:2])
-                
-                # Calculate how straight the body line is
-                vec1 = hip - shoulder
-                vec2 = ankle - hip
-                
-                # Angle between vectors (should be close to 180 for straight line)
-                cos_angle = np.dot(vec1, vec2) / (np.linalg.norm(vec1) * np.linalg.norm(vec2) + 1e-6)
-                cos_angle = np.clip(cos_angle, -1, 1)
-                angle = np.arccos(cos_angle) * 180 / np.pi
-                
-                # Score: closer to 180 degrees = better alignment
-                alignment_score = 1 - abs(angle - 180) / 180
-                alignment_scores.append(alignment_score)
-        
-        if alignment_scores:
-            features.extend([
-                np.mean(alignment_scores),  # Average body alignment
-                np.min(alignment_scores),  # Worst alignment
-                np.std(alignment_scores)    # Alignment consistency
-            ])
-        else:
-            features.extend([0, 0, 0])
-        
+        shoulder_idx = landmark_map.get('left_shoulder', 11)
+        hip_idx = landmark_map.get('left_hip', 23)
+        ankle_idx = landmark_map.get('left_ankle', 27)
+        max_needed = max(shoulder_idx, hip_idx, ankle_idx, 27)
+
+        valid = [frame.get('landmarks', []) for frame in pose_data
+                 if len(frame.get('landmarks', [])) > max_needed]
+
+        if valid:
+            arr = np.asarray(valid, dtype=np.float32)
+            shoulder = np.ascontiguousarray(arr[:, shoulder_idx, :2])
+            hip = np.ascontiguousarray(arr[:, hip_idx, :2])
+            ankle = np.ascontiguousarray(arr[:, ankle_idx, :2])
+
+            # Per-frame segment angle via atan2(|cross|, dot), scored so
+            # that closer to 180 degrees = better alignment; the kernel
+            # returns mean (average), min (worst) and std (consistency)
+            out[0], out[1], out[2] = alignment_stats(shoulder, hip, ankle)
+
         # Exercise completion features
         # Detect if full range of motion was achieved
         angles = []
@@ -217,40 +271,53 @@ class FeatureExtractor:
                 angles.extend(all_frame_angles)
         
         if angles:
-            angle_array = np.array(angles)
-            features.extend([
-                np.max(angle_array) - np.min(angle_array),  # Total range
-                len(pose_data),  # Number of frames
-                np.mean([len(frame.get('angles', {})) for frame in pose_data])  # Average detected joints
-            ])
-        else:
-            features.extend([0, 0, 0])
-        
-        # Symmetry features (left vs right side)
-        symmetry_scores = []
-        for frame in pose_data:
-            angles = frame.get('angles', {})
-            left_elbow = angles.get('left_elbow', 180)
-            right_elbow = angles.get('right_elbow', 180)
-            left_shoulder = angles.get('left_shoulder', 180)
-            right_shoulder = angles.get('right_shoulder', 180)
-            
-            elbow_symmetry = 1 - abs(left_elbow - right_elbow) / 180
-            shoulder_symmetry = 1 - abs(left_shoulder - right_shoulder) / 180
-            
-            symmetry_scores.append((elbow_symmetry + shoulder_symmetry) / 2)
-        
-        if symmetry_scores:
-            features.append(np.mean(symmetry_scores))
-        else:
-            features.append(0)
-        
-        return features
+            angle_array = np.array(angles, dtype=np.float32)
+            out[3] = np.max(angle_array) - np.min(angle_array)  # Total range
+            out[4] = len(pose_data)  # Number of frames
+            out[5] = np.mean([len(frame.get('angles', {})) for frame in pose_data])  # Average detected joints
+
+        # Symmetry features (left vs right side), as one vectorized pass
+        # over (frames, 4) columns instead of per-frame dict lookups
+        if angle_series is not None:
+            out[6] = self._symmetry_from_series(angle_series, len(pose_data))
+            return
+
+        sym_buf = np.empty((len(pose_data), 4), dtype=np.float32)
+        for i, frame in enumerate(pose_data):
+            frame_angles = frame.get('angles', {})
+            sym_buf[i, 0] = frame_angles.get('left_elbow', 180)
+            sym_buf[i, 1] = frame_angles.get('right_elbow', 180)
+            sym_buf[i, 2] = frame_angles.get('left_shoulder', 180)
+            sym_buf[i, 3] = frame_angles.get('right_shoulder', 180)
+
+        out[6] = self._symmetry_from_buf(sym_buf)
+
+    @staticmethod
+    def _symmetry_from_buf(sym_buf: np.ndarray) -> float:
+        """Mean left/right symmetry score from a (frames, 4) angle buffer"""
+        # 1 - |L-R|/180 averaged over joints and frames, rearranged to
+        # (180 - |L-R|) with one normalization at the end: a single
+        # branch-free subtract/abs pass over the strided pairs
+        return float((180.0 - np.abs(sym_buf[:, 0::2] - sym_buf[:, 1::2])).mean() / 180.0)
+
+    def _symmetry_from_series(
+        self, angle_series: Dict[str, np.ndarray], n_frames: int
+    ) -> float:
+        """Mean left/right symmetry score from precomputed angle columns"""
+        default = np.full(n_frames, 180, dtype=np.float32)
+        sym_buf = np.stack([
+            angle_series.get(name, default)
+            for name in ('left_elbow', 'right_elbow',
+                         'left_shoulder', 'right_shoulder')
+        ], axis=1)
+        return self._symmetry_from_buf(sym_buf)
     
+    # Statistical features: 3 alignment + 3 completion + 1 symmetry
+    _STATISTICAL_FEATURES = 7
+
     def _get_feature_count(self) -> int:
         """Get the total number of features this extractor produces"""
-        # Frame features: 4 angle types * 5 stats = 20
-        # Temporal features: 6 landmarks * 3 stats + 1 smoothness = 19
-        # Statistical features: ~10
-        return 49  # Approximate, adjust based on actual extraction
+        frame_features = 5 * len(self.ANGLE_PAIRS)             # 5 stats per joint
+        temporal_features = 3 * len(self.KEY_LANDMARKS) + 1    # mean/std/max + smoothness
+        return frame_features + temporal_features + self._STATISTICAL_FEATURES
 
@@ -0,0 +1,14 @@
+"""
+Process-wide ModelTrainer factory.
+Ensures analyzers and the API share a single trainer instance instead of
+reloading models per request.
+"""
+import functools
+
+from .model_trainer import ModelTrainer
+
+
+@functools.cache
+def get_trainer() -> ModelTrainer:
+    """Return the shared ModelTrainer instance, creating it on first use"""
+    return ModelTrainer()
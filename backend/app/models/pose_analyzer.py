@@ -1,150 +1,208 @@
 import cv2
+import functools
+import multiprocessing
 import numpy as np
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from typing import Dict, List, Tuple, Optional
 import math
+from ._pose_kernels import joint_angles
 from .exercises.pull_up_analyzer import PullUpAnalyzer
 from .exercises.push_up_analyzer import PushUpAnalyzer
 from .exercises.squat_analyzer import SquatAnalyzer
 
+
+# One long-lived chunk pool per server process, created on first long
+# video and reused by every later request: spawn startup (interpreter +
+# cv2/mediapipe imports + graph build per worker) is paid once, and a
+# single cpu_count-wide pool bounds total processes no matter how many
+# request threads want parallel analysis
+_chunk_executor = None
+_chunk_executor_lock = threading.Lock()
+
+
+def _get_chunk_executor() -> ProcessPoolExecutor:
+    """Lazily create the shared spawn-context chunk executor"""
+    global _chunk_executor
+    with _chunk_executor_lock:
+        if _chunk_executor is None:
+            _chunk_executor = ProcessPoolExecutor(
+                max_workers=os.cpu_count() or 1,
+                mp_context=multiprocessing.get_context('spawn'))
+    return _chunk_executor
+
+
+@functools.lru_cache(maxsize=1)
+def _get_chunk_analyzer() -> 'PoseAnalyzer':
+    """
+    Process-local PoseAnalyzer for pool workers, built lazily on first
+    use. MediaPipe graphs are stateful and cannot be shared across
+    processes, but within one worker the same graph serves every chunk -
+    building it per chunk would dominate the pool's win.
+    """
+    return PoseAnalyzer()
+
+
+def _analyze_video_chunk(args) -> List[Dict]:
+    """
+    Worker for parallel video analysis: decode and analyze a contiguous
+    frame range with the per-process PoseAnalyzer.
+    """
+    video_path, start_frame, end_frame = args
+
+    analyzer = _get_chunk_analyzer()
+    if not analyzer.mediapipe_available:
+        return []
+
+    cap = cv2.VideoCapture(video_path)
+
+    # Same ~6 fps sampling as the serial path, keyed on the absolute
+    # frame index so the cadence is uniform across chunk boundaries
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    stride = max(1, int(fps / 6)) if fps and fps > 0 else 5
+
+    if start_frame:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+
+    chunk_data = []
+    for frame_idx in range(start_frame, end_frame):
+        # grab() advances the decoder cheaply; only sampled frames pay
+        # retrieve() and the MediaPipe pass
+        if not cap.grab():
+            break
+        if frame_idx % stride:
+            continue
+        ret, frame = cap.retrieve()
+        if not ret:
+            break
+        frame_analysis = analyzer._analyze_frame(frame)
+        if frame_analysis['pose_detected']:
+            frame_analysis['landmark_map'] = analyzer.landmarks
+            chunk_data.append(frame_analysis)
+
+    cap.release()
+    return chunk_data
+
+
+# Key pose landmarks (MediaPipe BlazePose indices)
+_POSE_LANDMARKS = {
+    'nose': 0,
+    'left_shoulder': 11,
+    'right_shoulder': 12,
+    'left_elbow': 13,
+    'right_elbow': 14,
+    'left_wrist': 15,
+    'right_wrist': 16,
+    'left_hip': 23,
+    'right_hip': 24,
+    'left_knee': 25,
+    'right_knee': 26,
+    'left_ankle': 27,
+    'right_ankle': 28
+}
+
+# Joint angles as (name, a, b, c) landmark triplets - the angle at b
+# between segments b->a and b->c
+_ANGLE_JOINTS = (
+    ('left_shoulder', 'left_hip', 'left_shoulder', 'left_elbow'),
+    ('left_elbow', 'left_shoulder', 'left_elbow', 'left_wrist'),
+    ('left_hip', 'left_shoulder', 'left_hip', 'left_knee'),
+    ('left_knee', 'left_hip', 'left_knee', 'left_ankle'),
+    ('right_shoulder', 'right_hip', 'right_shoulder', 'right_elbow'),
+    ('right_elbow', 'right_shoulder', 'right_elbow', 'right_wrist'),
+)
+
+
 class PoseAnalyzer:
-    def __init__(self):
-        """Initialize the pose analyzer (MediaPipe not available)"""
+    # Landmark and angle tables resolved once at import time; the index
+    # array feeds the joint_angles kernel as one gather, with no dict
+    # lookups left in the per-frame path
+    LANDMARKS = _POSE_LANDMARKS
+    _ANGLE_NAMES = tuple(name for name, _, _, _ in _ANGLE_JOINTS)
+    _ANGLE_IDX = np.array(
+        [(_POSE_LANDMARKS[a], _POSE_LANDMARKS[b], _POSE_LANDMARKS[c])
+         for _, a, b, c in _ANGLE_JOINTS], dtype=np.intp)
+
+    def __init__(self, model_complexity: int = 1):
+        """
+        Initialize the pose analyzer (MediaPipe not available).
+
+        Args:
+            model_complexity: BlazePose variant (0/1/2). The default of 1
+                runs several times faster than the full model at a small
+                accuracy cost; pass 2 where accuracy matters more than
+                throughput.
+        """
         # MediaPipe is not available, so we'll provide a mock implementation
         self.mediapipe_available = False
+        self.model_complexity = model_complexity
         try:
             import mediapipe as mp
             self.mp_pose = mp.solutions.pose
             self.mp_drawing = mp.solutions.drawing_utils
-            self.pose = self.mp_pose.Pose(
-                static_image_mode=False,
-                model_complexity=2,
-                enable_segmentation=False,
-                min_detection_confidence=0.5,
-                min_tracking_confidence=0.5
-            )
             self.mediapipe_available = True
         except ImportError:
             print("MediaPipe not available. Running in demo mode.")
             self.mediapipe_available = False
         
-        # Define key pose landmarks
-        self.landmarks = {
-            'nose': 0,
-            'left_shoulder': 11,
-            'right_shoulder': 12,
-            'left_elbow': 13,
-            'right_elbow': 14,
-            'left_wrist': 15,
-            'right_wrist': 16,
-            'left_hip': 23,
-            'right_hip': 24,
-            'left_knee': 25,
-            'right_knee': 26,
-            'left_ankle': 27,
-            'right_ankle': 28
-        }
-        
-        # Exercise detection thresholds
-        self.exercise_analyzers = {
-            'pull_up': PullUpAnalyzer,
-            'push_up': PushUpAnalyzer,
-            'squat': SquatAnalyzer
-        }
+        # Key pose landmarks (shared class-level table)
+        self.landmarks = self.LANDMARKS
 
-    def analyze_exercise(self, file_path: str, exercise_type: str) -> Dict:
-        """Analyze exercise form from video or image file"""
-        try:
-            if exercise_type not in self.exercise_analyzers:
-                raise ValueError(f"Unsupported exercise type: {exercise_type}")
+        # Per-thread scratch state: gthread workers run requests
+        # concurrently on this one instance, so anything reused across
+        # frames (like the RGB conversion buffer) must not be shared
+        # between threads
+        self._local = threading.local()
 
-            if not self.mediapipe_available:
-                return self._demo_analysis(file_path, exercise_type)
-            
-            file_extension = file_path.lower().split('.')[-1]
-            
-            if file_extension in ['mp4', 'avi', 'mov']:
-                return self._analyze_video(file_path, exercise_type)
-            elif file_extension in ['jpg', 'jpeg', 'png', 'gif']:
-                return self._analyze_image(file_path, exercise_type)
-            else:
-                raise ValueError(f"Unsupported file type: {file_extension}")
-                
-        except Exception as e:
-            return {
-                'success': False,
-                'error': str(e),
-                'analysis': None
-            }
+        # Frames per worker chunk when analyzing long videos in parallel
+        # (roughly GOP-sized so each worker seeks to a keyframe boundary),
+        # and the minimum clip length that goes parallel at all - short
+        # clips finish serially before pool dispatch would even pay off
+        self.parallel_chunk_frames = 120
+        self.parallel_min_frames = 1800
 
-    def _analyze_video(self, video_path: str, exercise_type: str) -> Dict:
-        """Analyze exercise form from video file"""
-        cap = cv2.VideoCapture(video_path)
-        if not cap.isOpened():
-            raise ValueError("Could not open video file")
-        
-        frame_count = 0
-        pose_data = []
-        
-        while cap.isOpened():
-            ret, frame = cap.read()
-            if not ret:
-                break
-                
-            if frame_count % 5 == 0:
-                frame_analysis = self._analyze_frame(frame)
-                if frame_analysis['pose_detected']:
-                    pose_data.append(frame_analysis)
-            
-            frame_count += 1
-        
-        cap.release()
-        
-        if not pose_data:
-            return {
-                'success': False,
-                'error': 'No pose detected in video',
-                'analysis': None
-            }
-        
-        # Analyze form quality
-        form_analysis = self._analyze_form_quality(pose_data, exercise_type)
-        
-        return {
-            'success': True,
-            'exercise_type': exercise_type,
-            'analysis': form_analysis,
-            'frame_count': len(pose_data)
+        # One analyzer instance per exercise type, built once so each
+        # request is a dict lookup instead of a construction
+        self.exercise_analyzers = {
+            'pull_up': PullUpAnalyzer(),
+            'push_up': PushUpAnalyzer(),
+            'squat': SquatAnalyzer()
         }
 
-    def _analyze_image(self, image_path: str, exercise_type: str) -> Dict:
-        """Analyze exercise form from image file"""
-        image = cv2.imread(image_path)
-        if image is None:
-            raise ValueError("Could not read image file")
-        
-        frame_analysis = self._analyze_frame(image)
-        
-        if not frame_analysis['pose_detected']:
-            return {
-                'success': False,
-                'error': 'No pose detected in image',
-                'analysis': None
-            }
-        
-        form_analysis = self._analyze_form_quality([frame_analysis], exercise_type)
-        
-        return {
-            'success': True,
-            'exercise_type': exercise_type,
-            'analysis': form_analysis,
-            'frame_count': 1
-        }
+    @property
+    def pose(self):
+        """
+        The per-thread BlazePose graph, built lazily on first use.
+
+        Pose.process() is stateful (frame-to-frame tracking) and not
+        thread-safe, so concurrent gthread requests each get their own
+        graph instead of interleaving tracking state across videos. Lazy
+        construction also keeps graphs out of the gunicorn master under
+        --preload: native MediaPipe state does not survive a fork.
+        """
+        graph = getattr(self._local, 'pose_graph', None)
+        if graph is None:
+            graph = self._local.pose_graph = self.mp_pose.Pose(
+                static_image_mode=False,
+                model_complexity=self.model_complexity,
+                enable_segmentation=False,
+                min_detection_confidence=0.5,
+                min_tracking_confidence=0.5
+            )
+        return graph
 
     def _analyze_frame(self, frame) -> Dict:
         """Analyze a single frame for pose detection"""
-        # Convert BGR to RGB
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        
+        # Convert BGR to RGB into a persistent per-thread buffer; the
+        # channel swap still costs one memory pass but no longer a
+        # per-frame malloc, and concurrent requests on other threads
+        # each get their own buffer
+        rgb_buf = getattr(self._local, 'rgb_buf', None)
+        if rgb_buf is None or rgb_buf.shape != frame.shape:
+            rgb_buf = self._local.rgb_buf = np.empty_like(frame)
+        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=rgb_buf)
+
         # Process the frame
         results = self.pose.process(rgb_frame)
         
@@ -155,84 +213,29 @@ class PoseAnalyzer:
                 'angles': None
             }
         
-        # Extract landmarks
-        landmarks = []
-        for landmark in results.pose_landmarks.landmark:
-            landmarks.append([landmark.x, landmark.y, landmark.z])
-        
+        # Extract landmarks as one (33, 3) array
+        landmarks = np.array(
+            [(lm.x, lm.y, lm.z) for lm in results.pose_landmarks.landmark],
+            dtype=np.float32)
+
         # Calculate key angles
         angles = self._calculate_angles(landmarks)
-        
+
+        # Landmarks stay a float32 array end-to-end: the batch builders
+        # stack arrays without reconversion and the orjson response
+        # provider serializes NumPy natively, so there is no tolist()
+        # round-trip through Python floats
         return {
             'pose_detected': True,
             'landmarks': landmarks,
             'angles': angles
         }
 
-    def _calculate_angles(self, landmarks: List[List[float]]) -> Dict[str, float]:
-        """Calculate key joint angles from landmarks"""
-        angles = {}
-        
-        # Calculate shoulder angle (left)
-        if all(landmarks[i] for i in [self.landmarks['left_hip'],
-                                     self.landmarks['left_shoulder'],
-                                     self.landmarks['left_elbow']]):
-            angles['left_shoulder'] = self._calculate_angle(
-                landmarks[self.landmarks['left_hip']],
-                landmarks[self.landmarks['left_shoulder']],
-                landmarks[self.landmarks['left_elbow']]
-            )
-        
-        # Calculate elbow angle (left)
-        if all(landmarks[i] for i in [self.landmarks['left_shoulder'], 
-                                     self.landmarks['left_elbow'], 
-                                     self.landmarks['left_wrist']]):
-            angles['left_elbow'] = self._calculate_angle(
-                landmarks[self.landmarks['left_shoulder']],
-                landmarks[self.landmarks['left_elbow']],
-                landmarks[self.landmarks['left_wrist']]
-            )
-        
-        # Calculate hip angle (left)
-        if all(landmarks[i] for i in [self.landmarks['left_shoulder'], 
-                                     self.landmarks['left_hip'], 
-                                     self.landmarks['left_knee']]):
-            angles['left_hip'] = self._calculate_angle(
-                landmarks[self.landmarks['left_shoulder']],
-                landmarks[self.landmarks['left_hip']],
-                landmarks[self.landmarks['left_knee']]
-            )
-        
-        # Calculate knee angle (left)
-        if all(landmarks[i] for i in [self.landmarks['left_hip'], 
-                                     self.landmarks['left_knee'], 
-                                     self.landmarks['left_ankle']]):
-            angles['left_knee'] = self._calculate_angle(
-                landmarks[self.landmarks['left_hip']],
-                landmarks[self.landmarks['left_knee']],
-                landmarks[self.landmarks['left_ankle']]
-            )
-        
-        # Right side angles (similar calculations)
-        if all(landmarks[i] for i in [self.landmarks['right_hip'],
-                                     self.landmarks['right_shoulder'],
-                                     self.landmarks['right_elbow']]):
-            angles['right_shoulder'] = self._calculate_angle(
-                landmarks[self.landmarks['right_hip']],
-                landmarks[self.landmarks['right_shoulder']],
-                landmarks[self.landmarks['right_elbow']]
-            )
-        
-        if all(landmarks[i] for i in [self.landmarks['right_shoulder'], 
-                                     self.landmarks['right_elbow'], 
-                                     self.landmarks['right_wrist']]):
-            angles['right_elbow'] = self._calculate_angle(
-                landmarks[self.landmarks['right_shoulder']],
-                landmarks[self.landmarks['right_elbow']],
-                landmarks[self.landmarks['right_wrist']]
-            )
-        
-        return angles
+    def _calculate_angles(self, landmarks) -> Dict[str, float]:
+        """Calculate all key joint angles in one kernel call"""
+        points = np.ascontiguousarray(landmarks, dtype=np.float32)
+        degrees = joint_angles(points, self._ANGLE_IDX)
+        return {name: float(angle) for name, angle in zip(self._ANGLE_NAMES, degrees)}
 
     def _calculate_angle(self, a: List[float], b: List[float], c: List[float]) -> float:
         """Calculate angle between three points"""
@@ -252,17 +255,7 @@ class PoseAnalyzer:
         """
         Analyze exercise form from a video file for a specific exercise type.
         """
-        from .exercises.pull_up_analyzer import PullUpAnalyzer
-        from .exercises.push_up_analyzer import PushUpAnalyzer
-        from .exercises.squat_analyzer import SquatAnalyzer
-
-        analyzers = {
-            'pull_up': PullUpAnalyzer,
-            'push_up': PushUpAnalyzer,
-            'squat': SquatAnalyzer,
-        }
-
-        if exercise_type not in analyzers:
+        if exercise_type not in self.exercise_analyzers:
             return {'success': False, 'error': f"Invalid exercise type: {exercise_type}"}
 
         try:
@@ -273,27 +266,52 @@ class PoseAnalyzer:
             if not cap.isOpened():
                 raise ValueError("Could not open video file")
 
-            pose_data = []
-            while cap.isOpened():
-                ret, frame = cap.read()
-                if not ret:
-                    break
-                
-                frame_analysis = self._analyze_frame(frame)
-                if frame_analysis['pose_detected']:
-                    # Add landmark map to each frame's data
-                    frame_analysis['landmark_map'] = self.landmarks
-                    pose_data.append(frame_analysis)
-            
-            cap.release()
+            total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+
+            if total_frames >= self.parallel_min_frames:
+                # Long video: frame batches are independent, so decode and
+                # analyze keyframe-sized chunks across worker processes
+                cap.release()
+                pose_data = self._analyze_video_parallel(file_path, total_frames)
+            else:
+                # Sample at roughly 6 fps regardless of source frame
+                # rate; grab() advances the decoder without the full
+                # decode + colour conversion, so only sampled frames pay
+                # retrieve() and the MediaPipe pass
+                fps = cap.get(cv2.CAP_PROP_FPS)
+                stride = max(1, int(fps / 6)) if fps and fps > 0 else 5
+
+                pose_data = []
+                frame_count = 0
+                while cap.isOpened():
+                    if not cap.grab():
+                        break
+
+                    if frame_count % stride == 0:
+                        ret, frame = cap.retrieve()
+                        if not ret:
+                            break
+                        frame_analysis = self._analyze_frame(frame)
+                        if frame_analysis['pose_detected']:
+                            # Add landmark map to each frame's data
+                            frame_analysis['landmark_map'] = self.landmarks
+                            pose_data.append(frame_analysis)
+
+                    frame_count += 1
+
+                cap.release()
 
             if not pose_data:
                 return {'success': False, 'error': 'No pose detected in video'}
 
-            # Get the specific analyzer and analyze the form
-            analyzer_class = analyzers[exercise_type]
-            analyzer = analyzer_class() if callable(analyzer_class) else analyzer_class
-            form_analysis = analyzer.analyze_form(pose_data, exercise_type)
+            # Get the specific analyzer and analyze the form. Build the
+            # structure-of-arrays batch once up front and hand it over
+            # directly, so every rule check and the ML feature pass slice
+            # the same (frames, 33, 3) landmark tensor and per-angle
+            # columns instead of walking the frame dicts again.
+            analyzer = self.exercise_analyzers[exercise_type]
+            batch = analyzer.pose_batch(pose_data)
+            form_analysis = analyzer.analyze_form(batch, exercise_type)
 
             return {
                 'success': True,
@@ -306,6 +324,30 @@ class PoseAnalyzer:
         except Exception as e:
             return {'success': False, 'error': str(e)}
 
+    def _analyze_video_parallel(self, file_path: str, total_frames: int) -> List[Dict]:
+        """
+        Analyze a video by splitting it into contiguous frame chunks and
+        processing them in a worker pool. Each worker runs its own decoder
+        and MediaPipe graph; results are merged in frame order.
+        """
+        chunks = [
+            (file_path, start, min(start + self.parallel_chunk_frames, total_frames))
+            for start in range(0, total_frames, self.parallel_chunk_frames)
+        ]
+
+        # The executor is shared and long-lived: spawned workers (forking
+        # from a threaded gunicorn request handler can deadlock) import
+        # their dependencies and build their cached analyzer once, then
+        # amortize that across every long video the process serves
+        chunk_results = list(_get_chunk_executor().map(_analyze_video_chunk, chunks))
+
+        return [frame for chunk in chunk_results for frame in chunk]
+
+    def invalidate_model_cache(self, exercise_type: str = None) -> None:
+        """Drop cached model-status lookups after a model is (re)trained"""
+        from .exercises.base_analyzer import BaseAnalyzer
+        BaseAnalyzer.invalidate_model_cache(exercise_type)
+
     def _demo_analysis(self, file_path: str) -> Dict:
         """Demo analysis when MediaPipe is not available"""
         # Determine file type
@@ -1,10 +1,14 @@
 import os
 from typing import Set
 
+# Extension sets built once at import; per-call construction made every
+# upload check rebuild them
+_VIDEO_EXTENSIONS = frozenset({'mp4', 'avi', 'mov', 'mkv', 'wmv', 'flv'})
+_IMAGE_EXTENSIONS = frozenset({'png', 'jpg', 'jpeg', 'gif', 'bmp', 'tiff'})
+
 def allowed_file(filename: str, allowed_extensions: Set[str]) -> bool:
     """Check if a file has an allowed extension"""
-    return '.' in filename and \
-           filename.rsplit('.', 1)[1].lower() in allowed_extensions
+    return os.path.splitext(filename)[1][1:].lower() in allowed_extensions
 
 def create_upload_folder(folder_path: str) -> None:
     """Create upload folder if it doesn't exist"""
@@ -15,19 +19,17 @@ def get_file_size_mb(file_path: str) -> float:
     """Get file size in megabytes"""
     if not os.path.exists(file_path):
         return 0.0
-    
+
     size_bytes = os.path.getsize(file_path)
     return size_bytes / (1024 * 1024)
 
 def is_valid_video_file(filename: str) -> bool:
     """Check if file is a valid video format"""
-    video_extensions = {'mp4', 'avi', 'mov', 'mkv', 'wmv', 'flv'}
-    return allowed_file(filename, video_extensions)
+    return allowed_file(filename, _VIDEO_EXTENSIONS)
 
 def is_valid_image_file(filename: str) -> bool:
     """Check if file is a valid image format"""
-    image_extensions = {'png', 'jpg', 'jpeg', 'gif', 'bmp', 'tiff'}
-    return allowed_file(filename, image_extensions)
+    return allowed_file(filename, _IMAGE_EXTENSIONS)
 
 def get_file_type(filename: str) -> str:
     """Get the type of file (video, image, or unknown)"""
@@ -36,4 +38,4 @@ def get_file_type(filename: str) -> str:
     elif is_valid_image_file(filename):
         return 'image'
     else:
-        return 'unknown' 
\ No newline at end of file
+        return 'unknown'
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Bulk MediaPipe preprocessing for training videos.
+
+Extracts pose landmarks from every video in a directory into one
+Parquet file per video (33 landmarks x x/y/z/visibility per frame,
+float32 columns). Landmarks stream into a preallocated NumPy buffer, so
+there is no per-row Python list growth and no float-to-text formatting;
+Parquet files are a few times smaller than CSV and reload into the
+training pipeline without reparsing. Falls back to CSV when pyarrow is
+not installed.
+
+Files are processed in parallel across a process pool: MediaPipe's Pose
+graph is CPU-bound and not fork-safe, so each worker lazily builds its
+own graph.
+
+Usage:
+    python mediapipe_bulk_processor.py <video_dir> [output_dir]
+"""
+import csv
+import functools
+import os
+import sys
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import Tuple
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+    print("Warning: pyarrow not available. Falling back to CSV output.")
+
+VIDEO_EXTENSIONS = {'.mp4', '.avi', '.mov'}
+
+# 33 landmarks x (x, y, z, visibility)
+ROW_WIDTH = 132
+CSV_HEADER = [f'{axis}{i}' for i in range(33) for axis in ('x', 'y', 'z', 'v')]
+
+
+@functools.lru_cache(maxsize=1)
+def _get_pose():
+    """Process-local Pose graph, built lazily inside each worker"""
+    import mediapipe as mp
+    return mp.solutions.pose.Pose(
+        static_image_mode=False,
+        model_complexity=1,
+        min_detection_confidence=0.5
+    )
+
+
+def process_video(video_path: str, output_path: str) -> Tuple[str, int]:
+    """Extract per-frame landmarks from one video into a Parquet file"""
+    import cv2
+
+    pose = _get_pose()
+    cap = cv2.VideoCapture(video_path)
+
+    # Preallocate from the container's frame count; some containers
+    # report none, so grow by doubling if the probe was short
+    n_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    buf = np.empty((max(n_frames, 256), ROW_WIDTH), dtype=np.float32)
+    idx = 0
+
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        results = pose.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+        if results.pose_landmarks:
+            if idx == buf.shape[0]:
+                buf = np.resize(buf, (buf.shape[0] * 2, ROW_WIDTH))
+            buf[idx] = np.fromiter(
+                (value for lm in results.pose_landmarks.landmark
+                 for value in (lm.x, lm.y, lm.z, lm.visibility)),
+                dtype=np.float32, count=ROW_WIDTH)
+            idx += 1
+
+    cap.release()
+    buf = buf[:idx]
+
+    _write_landmarks(output_path, buf)
+    return video_path, idx
+
+
+def _write_landmarks(output_path: str, buf: np.ndarray) -> None:
+    """Write a (frames, 132) landmark buffer as Parquet (or CSV fallback)"""
+    if PYARROW_AVAILABLE:
+        table = pa.Table.from_arrays(
+            [buf[:, i] for i in range(ROW_WIDTH)], names=CSV_HEADER)
+        pq.write_table(table, output_path)
+        return
+
+    with open(output_path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_HEADER)
+        writer.writerows(buf.tolist())
+
+
+def _process_one(task: Tuple[str, str]) -> Tuple[str, int]:
+    """Pool-friendly wrapper around process_video"""
+    return process_video(*task)
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+
+    video_dir = sys.argv[1]
+    output_dir = sys.argv[2] if len(sys.argv) > 2 else video_dir
+    os.makedirs(output_dir, exist_ok=True)
+
+    out_ext = 'parquet' if PYARROW_AVAILABLE else 'csv'
+    tasks = []
+    # scandir reuses the readdir type info, avoiding a stat per entry
+    with os.scandir(video_dir) as it:
+        for entry in sorted(it, key=lambda e: e.name):
+            if not entry.is_file():
+                continue
+            stem, ext = os.path.splitext(entry.name)
+            if ext.lower() in VIDEO_EXTENSIONS:
+                tasks.append((
+                    entry.path,
+                    os.path.join(output_dir, f'{stem}.{out_ext}')
+                ))
+
+    if not tasks:
+        print(f"No videos found in {video_dir}")
+        return
+
+    print(f"Processing {len(tasks)} videos on {os.cpu_count()} workers...")
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        for video_path, n_frames in executor.map(_process_one, tasks):
+            print(f"{video_path}: {n_frames} frames with pose")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Horizontally mirror training videos to augment the dataset.
+
+Flipping doubles the training set and balances left/right-facing clips.
+Each file is piped straight through ffmpeg's hflip filter - the frames
+never round-trip through Python - and files encode concurrently across
+a process pool.
+
+Usage:
+    python python_flip_script.py <video_dir> [output_dir]
+"""
+import os
+import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Tuple
+
+VIDEO_EXTENSIONS = {'.mp4', '.avi', '.mov'}
+
+
+def flip_video(video_path: str, output_path: str) -> Tuple[str, bool]:
+    """Write a horizontally mirrored copy of one video via ffmpeg"""
+    result = subprocess.run(
+        ['ffmpeg', '-y', '-i', video_path,
+         '-vf', 'hflip',
+         '-c:v', 'libx264', '-preset', 'veryfast', '-threads', '0',
+         '-an', output_path],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    return video_path, result.returncode == 0
+
+
+def _flip_one(task: Tuple[str, str]) -> Tuple[str, bool]:
+    """Pool-friendly wrapper around flip_video"""
+    return flip_video(*task)
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+
+    video_dir = sys.argv[1]
+    output_dir = sys.argv[2] if len(sys.argv) > 2 else video_dir
+    os.makedirs(output_dir, exist_ok=True)
+
+    tasks = []
+    # scandir reuses the readdir type info, avoiding a stat per entry
+    with os.scandir(video_dir) as it:
+        for entry in sorted(it, key=lambda e: e.name):
+            if not entry.is_file():
+                continue
+            stem, ext = os.path.splitext(entry.name)
+            if ext.lower() in VIDEO_EXTENSIONS and not stem.endswith('_flipped'):
+                tasks.append((
+                    entry.path,
+                    os.path.join(output_dir, f'{stem}_flipped{ext}')
+                ))
+
+    if not tasks:
+        print(f"No videos found in {video_dir}")
+        return
+
+    print(f"Flipping {len(tasks)} videos on {os.cpu_count()} workers...")
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        for video_path, ok in executor.map(_flip_one, tasks):
+            print(f"{video_path}: {'done' if ok else 'FAILED'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,17 @@
+"""
+WSGI entry point for gunicorn.
+
+``app.py`` sits next to the ``app/`` package, so ``import app`` resolves
+to the package (regular packages shadow same-named modules on the same
+path entry) and never reaches the Flask object. Load the module
+explicitly by file path instead and re-export its ``app``.
+"""
+import importlib.util
+import os
+
+_spec = importlib.util.spec_from_file_location(
+    'backend_app', os.path.join(os.path.dirname(__file__), 'app.py'))
+_module = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(_module)
+
+app = _module.app